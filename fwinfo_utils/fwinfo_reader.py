@@ -1,12 +1,33 @@
-import binascii
+"""
+FWINFO channel reader.
+
+Message parsing relies on a native protobuf backend: upb (the default since
+protobuf 4.21) or the legacy cpp one. The pure-Python implementation, used
+when PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION=python is set or no native wheel is
+available, is orders of magnitude slower and is reported at import time.
+"""
 import asyncio
+from google.protobuf.internal import api_implementation
 from .protos import dt_fwinfo_pb2 as pb
 import logging
 
 logger = logging.getLogger(__name__)
 
+if api_implementation.Type() == "python":
+    logger.warning("Pure-Python protobuf backend in use, install a protobuf wheel with upb support")
+
 FWINFO_MUX_ADDR = 0x12  # fwinfo0 channel
 
+
+def _build_fwinfo_request() -> bytes:
+    msg = pb.CommandMessage()
+    msg.req.cmd = pb.Command.READ_DEVICE_INFO
+    return msg.SerializeToString()
+
+
+# The READ_DEVICE_INFO request never changes, so it is serialized only once
+FWINFO_REQUEST = _build_fwinfo_request()
+
 class FWInfoReader:
     def __init__(self):
         self._serial_future = asyncio.get_event_loop().create_future()
@@ -16,7 +37,7 @@ class FWInfoReader:
             resp = pb.CommandMessage.FromString(payload)
             if resp.HasField("res") and resp.res.HasField("dev_info"):
                 dev_info = resp.res.dev_info
-                logger.debug(f"Device serial number: {dev_info.serial_number}")
+                logger.debug("Device serial number: %s", dev_info.serial_number)
 
                 if not self._serial_future.done():
                     self._serial_future.set_result(dev_info.serial_number)
@@ -26,11 +47,7 @@ class FWInfoReader:
             logger.error(f"Failed to parse FWINFO response: {e}")
 
     def build_request(self) -> bytes:
-        msg = pb.CommandMessage()
-        msg.req.cmd = pb.Command.READ_DEVICE_INFO
-        msgSer = msg.SerializeToString()
-        logger.debug(f"Sending FWINFO request: {binascii.hexlify(msgSer)}")
-        return msgSer
+        return FWINFO_REQUEST
 
     async def wait_serial(self) -> str:
         return await self._serial_future
\ No newline at end of file
@@ -1,37 +1,63 @@
 import asyncio
-import json
-import base64
+import binascii
 import logging
 import serial_asyncio
 
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
 from .config import MUX_PATH, BAUDRATE, SETTINGS_MUX_ADDR, SMP_SRV_MUX_ADDR, RESTART_CMD, AUTH_KEY
 from .slip_utils.slip_dispatcher import SlipDispatcher, Slip
 from .settings_utils.settings_handler import SettingsHandler
+from .settings_utils import json_codec
 from .settings_utils.settings_authorizer import DTSettingsAuthorizer
-from .fwinfo_utils.fwinfo_reader import FWInfoReader, FWINFO_MUX_ADDR
+from .fwinfo_utils.fwinfo_reader import FWInfoReader, FWINFO_MUX_ADDR, FWINFO_REQUEST
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Reconnect after restart: overall budget, backoff bounds and settings probe timeout (seconds)
+RECONNECT_TIMEOUT = 10.0
+# A reply this soon after the restart command may still come from the old firmware,
+# unless the port was seen going away in between
+RESTART_SETTLE_TIME = 1.0
+RECONNECT_DELAY_MIN = 0.05
+RECONNECT_DELAY_MAX = 0.5
+PROBE_TIMEOUT = 0.3
+
+# Constant SLIP frames, encoded once at import
+_FWINFO_FRAME = Slip.encode(bytes([FWINFO_MUX_ADDR]) + FWINFO_REQUEST)
+_RESTART_FRAME = Slip.encode(bytes([SMP_SRV_MUX_ADDR]) + bytes(RESTART_CMD))
+_READ_FRAME = Slip.encode(bytes([SETTINGS_MUX_ADDR]) + b"{}")
+
 
 def restart_device(transport: serial_asyncio.SerialTransport):
-    restart_request = bytes([SMP_SRV_MUX_ADDR]) + bytes(RESTART_CMD)
-    encoded_request = Slip.encode(restart_request)
-    transport.write(encoded_request)
+    transport.write(_RESTART_FRAME)
 
 def read_settings(transport: serial_asyncio.SerialTransport):
     """Read settings by sending '{}' (empty json) command."""
-    read_request = bytes([SETTINGS_MUX_ADDR]) + b"{}"
-    transport.write(Slip.encode(read_request))
-
-async def upload_settings(transport, handler, payload: dict, verify_dict: dict | None = None):
-    """Helper: send JSON payload, wait for response, and optionally verify."""
-    json_bytes = json.dumps(payload).encode("utf-8")
+    transport.write(_READ_FRAME)
+
+async def upload_settings(transport, handler, payload: dict, verify_dict: dict | None = None,
+                          settle_time: float = 0.2):
+    """
+    Helper: send JSON payload, wait for response, and optionally verify.
+    After the write, waits up to settle_time for the device to answer before
+    reading back.
+    """
+    json_bytes = json_codec.dumps(payload)
     packet = bytes([SETTINGS_MUX_ADDR]) + json_bytes
     encoded = Slip.encode(packet)
+
+    handler.write_ack.clear()
     transport.write(encoded)
-    
-    await asyncio.sleep(0.2) # device needs processing time
+    # device needs processing time, continue early once it answers
+    try:
+        await asyncio.wait_for(handler.write_ack.wait(), timeout=settle_time)
+    except asyncio.TimeoutError:
+        pass
 
     # follow with a read request to fetch back config
     read_settings(transport)
@@ -109,8 +135,9 @@ async def main():
     authorizer = DTSettingsAuthorizer(key)
 
     # get device serial
-    msgSer = fwinfo.build_request()
-    transport.write(Slip.encode(bytes([FWINFO_MUX_ADDR]) + msgSer))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Sending FWINFO request: %s", binascii.hexlify(FWINFO_REQUEST).decode())
+    transport.write(_FWINFO_FRAME)
     serial = await fwinfo.wait_serial()
     logger.info(f"Using serial: {serial}")
 
@@ -131,19 +158,32 @@ async def main():
 
     transport.close()
 
-    # Try to reconnect
-    for i in range(10):
-        await asyncio.sleep(1.0)
+    # Try to reconnect, polling quickly at first and backing off while the device boots
+    loop = asyncio.get_running_loop()
+    restart_time = loop.time()
+    deadline = restart_time + RECONNECT_TIMEOUT
+    delay = RECONNECT_DELAY_MIN
+    device_gone = False
+    while loop.time() < deadline:
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, RECONNECT_DELAY_MAX)
         try:
             transport, _ = await dispatcher.start(MUX_PATH, baudrate=BAUDRATE)
-            logger.info("Reconnected to device, checking settings...")
-            read_settings(transport)
-            received = await settings_handler.wait_response()
-            if received:
+        except Exception as e:
+            logger.debug("Reconnect attempt failed: %s", e)
+            device_gone = True
+            continue
+
+        logger.debug("Reconnected to device, checking settings...")
+        settings_handler.reset()
+        read_settings(transport)
+        received = await settings_handler.wait_response(timeout=PROBE_TIMEOUT, quiet=True)
+        if received:
+            if device_gone or loop.time() - restart_time >= RESTART_SETTLE_TIME:
                 logger.info("Device restarted successfully")
                 break
-        except Exception as e:
-            logger.debug(f"Reconnect attempt failed: {e}")
+            logger.debug("Device answered before restarting, probing again")
+        transport.close()
     else:
         logger.error("Device restart timed out")
 
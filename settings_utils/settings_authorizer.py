@@ -1,13 +1,33 @@
-import json
-import base64
-from Crypto.Cipher import AES
+from . import json_codec
+
+try:
+    import pybase64 as base64  # SIMD accelerated, drop-in compatible
+except ImportError:
+    import base64
 
 import logging
 logger = logging.getLogger(__name__)
 
+# Prefer OpenSSL's AES-CCM (AES-NI accelerated), fall back to PyCryptodome
+try:
+    from cryptography.hazmat.primitives.ciphers.aead import AESCCM
+    AES = None
+    CCM_BACKEND = "cryptography (OpenSSL)"
+except ImportError:
+    AESCCM = None
+    from Crypto.Cipher import AES
+    CCM_BACKEND = "PyCryptodome"
+
+CCM_NONCE = bytes(13)
+CCM_TAG_LEN = 16
+
 class DTSettingsAuthorizer:
     def __init__(self, key: bytes):
         self.key = key
+        # AESCCM objects are stateless per call, so the key schedule is built once
+        self._ccm = AESCCM(key, tag_length=CCM_TAG_LEN) if AESCCM is not None else None
+        self.backend = CCM_BACKEND
+        logger.info(f"Using {self.backend} AES-CCM backend")
 
     def sign_settings(self, settings: dict, serial: str) -> dict:
         """
@@ -18,15 +38,23 @@ class DTSettingsAuthorizer:
         settings_with_sn = dict(settings)
         settings_with_sn["sn"] = serial
 
-        logger.debug(f"Signing content: {json.dumps(settings_with_sn)}")
+        # Compact JSON keeps the signed payload (and its base64) small
+        settings_json = json_codec.dumps(settings_with_sn)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Signing content: %s", settings_json.decode("utf-8"))
 
         # Encode settings JSON as base64
-        content = base64.b64encode(json.dumps(settings_with_sn).encode("utf-8"))
+        content = base64.b64encode(settings_json)
 
-        # AES-CCM with fixed nonce (bytearray(13)) to match device
-        c = AES.new(self.key, AES.MODE_CCM, nonce=bytearray(13))
-        _ = c.encrypt(content)  # encrypt required even if not used
-        tag = c.digest()
+        # AES-CCM with fixed nonce (bytes(13)) to match device
+        # The device verifies a CCM tag over content as plaintext, so neither
+        # CMAC nor passing content as associated data would be accepted.
+        if self._ccm is not None:
+            # Output is ciphertext || tag, only the tag is used
+            tag = self._ccm.encrypt(CCM_NONCE, content, None)[-CCM_TAG_LEN:]
+        else:
+            c = AES.new(self.key, AES.MODE_CCM, nonce=CCM_NONCE, mac_len=CCM_TAG_LEN)
+            _, tag = c.encrypt_and_digest(content)  # ciphertext is not used
 
         signature = base64.b64encode(tag)
 
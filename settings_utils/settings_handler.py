@@ -5,60 +5,128 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Characters of JSON scalars (numbers, true, false, null, NaN, Infinity)
+SCALAR_CHARS = frozenset("0123456789+-.eE" "truefalsenull" "NaNInfinity")
+
 class SettingsHandler:
     """
     Async handler for reading/writing settings over SLIP.
     Reassembles multi-chunk JSON responses and allows verification.
     """
 
+    # raw_decode reports where a complete JSON value ends, shared by all instances
+    _decoder = json.JSONDecoder()
+
     def __init__(self):
-        self.buffer = ""
-        self.brace_count = 0
-        self.in_json = False
+        self.buffer = bytearray()
         self.response_future: Optional[asyncio.Future] = None
+        # Set whenever a complete JSON message arrives, used as a write ack
+        self.write_ack = asyncio.Event()
 
     async def handle(self, payload: bytes):
         """
         Async callback for incoming SLIP packets for the settings channel.
         Reassembles JSON split across multiple packets.
         """
-        chunk = payload.decode("utf-8", errors="replace")
-        logger.debug(f"RX chunk: {chunk}")
-        self.buffer += chunk
-
-        # Update brace count for JSON reassembly
-        for ch in chunk:
-            if ch == '{':
-                self.brace_count += 1
-                self.in_json = True
-            elif ch == '}':
-                self.brace_count -= 1
-
-        # Complete JSON received
-        if self.in_json and self.brace_count == 0:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("RX chunk: %s", payload.decode("utf-8", errors="replace"))
+        self.buffer.extend(payload)
+
+        # A JSON object can only be completed by a chunk carrying '}'
+        if b'}' not in payload:
+            return
+
+        try:
+            text = self.buffer.decode("utf-8")
+        except UnicodeDecodeError as e:
+            if e.end == len(self.buffer) and e.reason == "unexpected end of data":
+                return  # multi-byte character split across chunks, wait for more data
+            text = self.buffer.decode("utf-8", errors="replace")
+        text = text.lstrip()
+        discarded = False
+
+        while text:
+            if text[0] != '{':
+                # Not a settings object, resynchronise on the next '{'
+                start = text.find('{')
+                logger.error("Discarding non-JSON settings data: %r", text if start == -1 else text[:start])
+                text = text[start:] if start != -1 else ""
+                continue
+
             try:
-                json_obj = json.loads(self.buffer)
+                json_obj, end = self._decoder.raw_decode(text)
             except json.JSONDecodeError as e:
-                logger.error(f"JSON decode error: {e}")
-                json_obj = None
+                if self._is_truncated(text, e.pos):
+                    break  # incomplete JSON, wait for more data
+
+                # Syntax error inside the text, resynchronise on the next '{'
+                resync = text.find('{', 1)
+                bad = text if resync == -1 else text[:resync]
+                logger.error(f"JSON decode error: {e}, discarding {bad!r}")
+                discarded = True
+                text = text[len(bad):]
+                continue
 
-            # Set the result to unblock waiting coroutine
-            if self.response_future and not self.response_future.done():
-                self.response_future.set_result(json_obj)
+            self._set_response(json_obj)
+            discarded = False
+            text = text[end:].lstrip()
 
-            # Reset buffer for next response
-            self.buffer = ""
-            self.in_json = False
+        # A bad response not followed by a good one still unblocks the waiter
+        if discarded:
+            self._set_response(None)
+
+        # Keep only the unparsed tail for the next response
+        self.buffer = bytearray(text.encode("utf-8"))
+
+    @staticmethod
+    def _is_truncated(text: str, error_pos: int) -> bool:
+        """
+        True if a decode error at error_pos can be fixed by more data: the text
+        ends inside a string opened before error_pos, or only a partial scalar
+        (number, true, false, null) follows error_pos.
+        """
+        if all(ch in SCALAR_CHARS for ch in text[error_pos:]):
+            return True
+
+        # Walk the string delimiters to find a string left open at the end
+        open_quote = -1
+        pos = text.find('"')
+        while pos != -1:
+            if open_quote == -1:
+                open_quote = pos
+            else:
+                backslashes = 0
+                while text[pos - 1 - backslashes] == '\\':
+                    backslashes += 1
+                if backslashes % 2 == 0:
+                    open_quote = -1
+            pos = text.find('"', pos + 1)
+        return open_quote != -1 and error_pos >= open_quote
+
+    def _set_response(self, json_obj) -> None:
+        # Set the result to unblock waiting coroutine
+        if self.response_future and not self.response_future.done():
+            self.response_future.set_result(json_obj)
+        self.write_ack.set()
+
+    def reset(self) -> None:
+        """
+        Drop any partially reassembled response, e.g. one cut off by a reconnect.
+        """
+        del self.buffer[:]
 
-    async def wait_response(self, timeout: float = 2.0):
+    async def wait_response(self, timeout: float = 2.0, quiet: bool = False):
         """
         Wait for a complete JSON response to be received.
+        With quiet=True a timeout is only logged at debug level.
         """
         self.response_future = asyncio.get_running_loop().create_future()
         try:
             return await asyncio.wait_for(self.response_future, timeout=timeout)
         except asyncio.TimeoutError:
-            logger.warning("Timeout waiting for settings response")
+            logger.log(logging.DEBUG if quiet else logging.WARNING, "Timeout waiting for settings response")
+            # A reply still pending now was cut off, don't let it prefix the next one
+            self.reset()
             return None
 
     def verify(self, expected: dict, received: dict) -> bool:
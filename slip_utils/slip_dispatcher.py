@@ -2,7 +2,7 @@ import argparse
 import asyncio
 import binascii
 import serial_asyncio
-from typing import Callable, Dict, List, Awaitable, Optional, Tuple
+from typing import Callable, Dict, Awaitable, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,43 +18,103 @@ class Slip:
     ESC_END_b = b"\xdc"
     ESC_ESC_b = b"\xdd"
 
+    # Escape sequences are built once instead of concatenated on every call
+    ESC_END_SEQ = ESC_b + ESC_END_b
+    ESC_ESC_SEQ = ESC_b + ESC_ESC_b
+
     @staticmethod
     def encode(data: bytes) -> bytes:
+        # bytes.replace returns the input unchanged when nothing matches, so
+        # frames without ESC/END cost two C scans and a single allocation.
+        # A Python-level exact-size writer measured several times slower.
         return (
-            data.replace(Slip.ESC_b, Slip.ESC_b + Slip.ESC_ESC_b)
-                .replace(Slip.END_b, Slip.ESC_b + Slip.ESC_END_b)
+            data.replace(Slip.ESC_b, Slip.ESC_ESC_SEQ)
+                .replace(Slip.END_b, Slip.ESC_END_SEQ)
             + Slip.END_b
         )
 
     @staticmethod
     def decode(data: bytes) -> bytes:
+        # Framing bytes are stripped before unescaping, so an escaped END at
+        # the edge of the payload is kept
+        data = data.strip(Slip.END_b)
+        # Most frames carry no escapes, skip the replace passes entirely
+        if Slip.ESC not in data:
+            return data
+        # Every ESC in an encoded frame starts an escape sequence, so ESC_END
+        # must be resolved first; otherwise an escaped ESC followed by a literal
+        # ESC_END byte would be collapsed into END.
         return (
-            data.replace(Slip.ESC_b + Slip.ESC_ESC_b, Slip.ESC_b)
-                .replace(Slip.ESC_b + Slip.ESC_END_b, Slip.END_b)
-        ).strip(Slip.END_b)
+            data.replace(Slip.ESC_END_SEQ, Slip.END_b)
+                .replace(Slip.ESC_ESC_SEQ, Slip.ESC_b)
+        )
 
 
 HandlerType = Callable[[bytes], Awaitable[None]]
 
 
 class SlipSerialReader(asyncio.Protocol):
-    def __init__(self, handler_map: Dict[int, List[HandlerType]]) -> None:
-        self.buffer = bytearray()
+    # Preallocated RX buffer size, well above what the UART delivers between reads
+    RX_BUFFER_SIZE = 64 * 1024
+
+    def __init__(self, handler_map: Dict[int, Tuple[HandlerType, ...]]) -> None:
+        # Pending bytes live in buffer[head:tail]
+        self.buffer = bytearray(self.RX_BUFFER_SIZE)
+        self.head = 0
+        self.tail = 0
         self.transport: Optional[asyncio.Transport] = None
         self.handler_map = handler_map
+        # Packets are processed in arrival order by a single consumer task
+        self._queue: asyncio.Queue[bytes] = asyncio.Queue()
+        self._consumer: Optional[asyncio.Task] = None
 
     def connection_made(self, transport: asyncio.Transport) -> None:
         self.transport = transport
         port = transport.get_extra_info('serial')
         logger.info(f"Connected to {port.port}")
+        self._consumer = asyncio.create_task(self._consume())
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        if self._consumer:
+            self._consumer.cancel()
+            self._consumer = None
 
     def data_received(self, data: bytes) -> None:
-        self.buffer.extend(data)
-        while Slip.END in self.buffer:
-            end_index = self.buffer.index(Slip.END)
-            raw_packet = bytes(self.buffer[:end_index + 1])
-            self.buffer = self.buffer[end_index + 1:]
-            asyncio.create_task(self.process_packet(raw_packet))
+        size = len(data)
+        if self.tail + size > len(self.buffer):
+            self._make_room(size)
+        self.buffer[self.tail:self.tail + size] = data
+        self.tail += size
+
+        # The view must be released before the buffer can be resized again
+        with memoryview(self.buffer) as view:
+            end_index = self.buffer.find(Slip.END, self.head, self.tail)
+            while end_index != -1:
+                raw_packet = bytes(view[self.head:end_index + 1])
+                self.head = end_index + 1
+                self._queue.put_nowait(raw_packet)
+                end_index = self.buffer.find(Slip.END, self.head, self.tail)
+
+        if self.head == self.tail:
+            self.head = 0
+            self.tail = 0
+
+    def _make_room(self, size: int) -> None:
+        """Move pending bytes to the front, growing the buffer only if they still don't fit."""
+        pending = self.tail - self.head
+        if self.head:
+            with memoryview(self.buffer) as view:
+                view[:pending] = view[self.head:self.tail]
+            self.head = 0
+            self.tail = pending
+        missing = pending + size - len(self.buffer)
+        if missing > 0:
+            self.buffer.extend(bytes(missing))
+
+    async def _consume(self) -> None:
+        while True:
+            packet = await self._queue.get()
+            await self.process_packet(packet)
 
     async def process_packet(self, packet: bytes) -> None:
         try:
@@ -63,22 +123,23 @@ class SlipSerialReader(asyncio.Protocol):
                 return
             address = decoded[0]
             payload = decoded[1:]
-            handlers = self.handler_map.get(address, [])
-            logger.debug(f"Received data on address: {address:#02x}")
-            if handlers:
+            handlers = self.handler_map.get(address, ())
+            logger.debug("Received data on address: %#02x", address)
+            # One handler per address is the common case, skip gather for it
+            if len(handlers) == 1:
+                await handlers[0](payload)
+            elif handlers:
                 await asyncio.gather(*(handler(payload) for handler in handlers))
         except Exception as e:
             logger.error(f"Error processing packet: {e}")
 
 class SlipDispatcher:
     def __init__(self) -> None:
-        self.handler_map: Dict[int, List[HandlerType]] = {}
+        self.handler_map: Dict[int, Tuple[HandlerType, ...]] = {}
 
     def register_handler(self, address: int, handler: HandlerType) -> None:
-        if address not in self.handler_map:
-            self.handler_map[address] = []
-
-        self.handler_map[address].append(handler)
+        # Handlers are stored as tuples, the map is read on every packet
+        self.handler_map[address] = self.handler_map.get(address, ()) + (handler,)
 
     async def start(self, port: str, baudrate: int = 115200) -> Tuple[serial_asyncio.SerialTransport, SlipSerialReader]:
         loop = asyncio.get_running_loop()
@@ -91,42 +152,64 @@ class SlipDispatcher:
         return transport, protocol
 
 class ProtobufDelimitedBuffer:
+    # Consumed bytes are only dropped from the buffer once the head passes this
+    COMPACT_THRESHOLD = 64 * 1024
+
     def __init__(self, consumer: Callable[[bytes], Awaitable[None]]):
         self.buffer = bytearray()
+        self.head = 0
         self.consumer = consumer
 
     async def feed(self, data: bytes):
         self.buffer.extend(data)
         while True:
-            msg, remaining = self._extract_next_message(self.buffer)
+            msg = self._extract_next_message()
             if msg is None:
                 break  # incomplete message, wait for more data
-            self.buffer = remaining
             await self.consumer(msg)
-    
-    def _read_varint(self, buf: bytearray) -> Tuple[int, int]:
-        """Returns (value, length of varint)"""
-        result = 0
-        shift = 0
-        for i, byte in enumerate(buf):
+
+        if self.head == len(self.buffer):
+            del self.buffer[:]
+            self.head = 0
+        elif self.head > self.COMPACT_THRESHOLD:
+            del self.buffer[:self.head]
+            self.head = 0
+
+    def _read_varint(self, buf: bytearray, offset: int = 0) -> Tuple[int, int]:
+        """Returns (value, length of varint) for the varint starting at offset"""
+        end = len(buf)
+        if offset >= end:
+            raise ValueError("Incomplete varint")
+        # Sizes below 128 (the usual case) fit in a single byte
+        byte = buf[offset]
+        if byte < 0x80:
+            return byte, 1
+        result = byte & 0x7F
+        shift = 7
+        pos = offset + 1
+        while pos < end:
+            byte = buf[pos]
             result |= (byte & 0x7F) << shift
-            if not (byte & 0x80):
-                return result, i + 1
+            pos += 1
+            if byte < 0x80:
+                return result, pos - offset
             shift += 7
         raise ValueError("Incomplete varint")
 
 
-    def _extract_next_message(self, buf: bytearray) -> Tuple[Optional[bytes], bytearray]:
+    def _extract_next_message(self) -> Optional[bytes]:
+        buf = self.buffer
         try:
-            size, size_len = self._read_varint(buf)
-            if len(buf) < size_len + size:
-                return None, buf  # incomplete payload
-            msg_start = size_len
-            msg_end = size_len + size
+            size, size_len = self._read_varint(buf, self.head)
+            msg_start = self.head + size_len
+            msg_end = msg_start + size
+            if len(buf) < msg_end:
+                return None  # incomplete payload
             msg = bytes(buf[msg_start:msg_end])
-            return msg, buf[msg_end:]
+            self.head = msg_end
+            return msg
         except Exception:
-            return None, buf  # malformed or incomplete
+            return None  # malformed or incomplete
 
 async def handler1(payload: bytes) -> None:
     logger.debug(f"[Handler1] Payload: {payload!r}")